@@ -161,6 +161,7 @@ const Shop = () => {
   const [includeImages, setIncludeImages] = useState(false);
   const [uploading, setUploading] = useState(false);
   const [downloadLink, setDownloadLink] = useState("");
+  const [progress, setProgress] = useState("");
   const [background, setBackground] = useState("");
 
   const handleFileChange = (e) => {
@@ -196,15 +197,63 @@ const Shop = () => {
       }
 
       const data = await response.json();
-      setDownloadLink(data.pptx_url);
+      const job = await waitForJob(data);
+      setDownloadLink(job.result.pptx_url);
     } catch (error) {
       console.error(error);
       alert("上傳失敗，請稍後再試！");
     } finally {
       setUploading(false);
+      setProgress("");
     }
   };
 
+  // Streams job progress; if the stream closes for good, polls the job status instead
+  const waitForJob = ({ events_url, status_url }) =>
+    new Promise((resolve, reject) => {
+      const settle = (job) => {
+        setProgress(`${job.stage} ${job.percent}%`);
+        if (job.status === "done") {
+          resolve(job);
+          return true;
+        }
+        if (job.status === "failed") {
+          reject(new Error(job.error));
+          return true;
+        }
+        return false;
+      };
+
+      const poll = async () => {
+        try {
+          const response = await fetch(status_url);
+          if (response.status === 404) {
+            reject(new Error("Job not found"));
+            return;
+          }
+          if (response.ok && settle(await response.json())) {
+            return;
+          }
+        } catch (error) {
+          console.error(error);
+        }
+        setTimeout(poll, 2000);
+      };
+
+      const source = new EventSource(events_url);
+      source.onmessage = (event) => {
+        if (settle(JSON.parse(event.data))) {
+          source.close();
+        }
+      };
+      // The browser reconnects on its own unless the stream was closed for good
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) {
+          poll();
+        }
+      };
+    });
+
   return (
     <Section id="mainContent">
       <Title>Upload Your Document</Title>
@@ -247,7 +296,7 @@ const Shop = () => {
           </div>
 
           <Button onClick={handleUpload} disabled={uploading}>
-            {uploading ? "Uploading..." : "Generate Slides"}
+            {uploading ? (progress ? `Generating... ${progress}` : "Uploading...") : "Generate Slides"}
           </Button>
 
           {downloadLink && (
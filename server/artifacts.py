@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+# A stored file: `id` is derived from its content, `filename` is the name it is served under
+Artifact = namedtuple("Artifact", ["id", "path", "filename", "size"])
+
+_ID = re.compile(r"^[0-9a-f]{32}$")
+_BLOCK_SIZE = 1024 * 1024
+
+logger = logging.getLogger("slidecraft.artifacts")
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for uploads and generated decks.
+
+    Each file is kept as <root>/<id>, where the id is the first 32 hex digits
+    of its SHA-256, next to a <id>.json sidecar holding the download filename.
+    Files are written under <root>/tmp and renamed into place, so readers never
+    see a partial artifact. `evict()` removes artifacts not used for
+    `ttl_seconds`, then the least recently used ones while the store holds more
+    than `max_bytes`; artifacts younger than `grace_seconds` are never evicted
+    for size, so inputs of queued jobs survive.
+    """
+
+    def __init__(self, root, ttl_seconds=24 * 3600, max_bytes=2 * 1024 ** 3, grace_seconds=600):
+        self.root = root
+        self.tmp_dir = os.path.join(root, "tmp")
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.grace_seconds = grace_seconds
+        self._last_access = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def temp_path(self, suffix=""):
+        """
+        Returns a fresh path under the store's tmp directory for staging a write.
+        """
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex + suffix)
+
+    async def save_stream(self, read, filename, max_bytes=None):
+        """
+        Streams `await read()` blocks into a new artifact, hashing as it goes.
+        Returns None, and keeps nothing, if more than `max_bytes` arrive.
+        """
+        tmp_path = self.temp_path()
+        digest = hashlib.sha256()
+        written = 0
+        with open(tmp_path, "wb") as f:
+            while block := await read():
+                written += len(block)
+                if max_bytes is not None and written > max_bytes:
+                    break
+                digest.update(block)
+                f.write(block)
+        if max_bytes is not None and written > max_bytes:
+            os.remove(tmp_path)
+            return None
+        return self.commit(tmp_path, filename, digest.hexdigest())
+
+    def commit(self, tmp_path, filename, digest=None):
+        """
+        Moves a finished file from the tmp directory into the store.
+
+        If the same content is already stored, the staged file is dropped and
+        the existing sidecar kept, so earlier downloads keep their filename;
+        the returned Artifact still carries `filename` for the caller.
+        """
+        if digest is None:
+            digest = hashlib.sha256()
+            with open(tmp_path, "rb") as f:
+                while block := f.read(_BLOCK_SIZE):
+                    digest.update(block)
+            digest = digest.hexdigest()
+        artifact_id = digest[:32]
+        path = os.path.join(self.root, artifact_id)
+        size = os.path.getsize(tmp_path)
+
+        meta_tmp = self.temp_path(".json")
+        with open(meta_tmp, "w") as f:
+            json.dump({"filename": filename, "size": size, "created": time.time()}, f)
+        with self._lock:
+            if os.path.exists(path) and os.path.exists(path + ".json"):
+                os.remove(tmp_path)
+                os.remove(meta_tmp)
+                # Restart the grace period, as a fresh write would
+                os.utime(path)
+            else:
+                os.replace(tmp_path, path)
+                os.replace(meta_tmp, path + ".json")
+            self._last_access[artifact_id] = time.time()
+        return Artifact(artifact_id, path, filename, size)
+
+    def get(self, artifact_id):
+        """
+        Returns the artifact with this id, or None if it is unknown or evicted.
+        """
+        if not _ID.match(artifact_id):
+            return None
+        path = os.path.join(self.root, artifact_id)
+        try:
+            with open(path + ".json") as f:
+                meta = json.load(f)
+            size = os.path.getsize(path)
+        except (OSError, ValueError):
+            return None
+        self._last_access[artifact_id] = time.time()
+        return Artifact(artifact_id, path, meta["filename"], size)
+
+    def evict(self):
+        """
+        Applies the TTL and size limits; returns the number of artifacts removed.
+        """
+        now = time.time()
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if _ID.match(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    last = max(stat.st_mtime, self._last_access.get(entry.name, 0))
+                    entries.append((last, stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+
+        removed = 0
+        total = sum(size for _, _, _, size in entries)
+        for last, created, artifact_id, size in entries:
+            expired = now - last > self.ttl_seconds
+            over = total > self.max_bytes and now - created > self.grace_seconds
+            if not (expired or over):
+                continue
+            with self._lock:
+                for path in (os.path.join(self.root, artifact_id), os.path.join(self.root, artifact_id + ".json")):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                self._last_access.pop(artifact_id, None)
+            total -= size
+            removed += 1
+
+        # Staging leftovers of crashed writes or jobs; live ones may be renamed
+        # into the store while we look, so vanished entries are skipped
+        with os.scandir(self.tmp_dir) as it:
+            for entry in it:
+                try:
+                    if now - entry.stat().st_mtime > self.ttl_seconds:
+                        if entry.is_dir():
+                            shutil.rmtree(entry.path, ignore_errors=True)
+                        else:
+                            os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    async def run_cleanup(self, interval):
+        """
+        Runs `evict()` every `interval` seconds until cancelled. A failed pass
+        is logged and the next one runs as usual.
+        """
+        while True:
+            try:
+                await asyncio.to_thread(self.evict)
+            except Exception:
+                logger.exception("Artifact eviction failed")
+            await asyncio.sleep(interval)
@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from extract import iter_paragraphs
+from chunking import chunk_paragraphs
+from render import render_presentation
+from pipeline import BACKGROUND_DIR, CHUNK_TOKENS, LLM_MODEL, outline_slides, summarize_chunks
+from metrics import request_id, span
+
+# Requests in flight across every document of a batch, and the optional pacing
+BATCH_LLM_CONCURRENCY = int(os.environ.get("BATCH_LLM_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+# Worker processes the server shares between all batch jobs
+BATCH_PROCESSES = int(os.environ.get("BATCH_PROCESSES", str(os.cpu_count() or 1)))
+
+
+class RequestScheduler:
+    """
+    Async context manager shared by all documents of a batch: at most
+    `concurrency` LLM requests run at once, and when `requests_per_minute`
+    is set, request starts are spaced evenly to stay under it.
+    """
+
+    def __init__(self, concurrency, requests_per_minute=0):
+        self._slots = asyncio.Semaphore(concurrency)
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._next_start = 0.0
+        self._pace = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self._slots.acquire()
+        if self._interval:
+            async with self._pace:
+                now = time.monotonic()
+                wait = self._next_start - now
+                self._next_start = max(now, self._next_start) + self._interval
+            if wait > 0:
+                await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._slots.release()
+
+
+def make_pool(processes=None):
+    """
+    Creates the process pool for extraction and rendering. Spawned workers
+    do not inherit the parent's event loop or open sockets.
+    """
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+def extract_chunks(docx_path, chunk_tokens, model):
+    """
+    Worker-process step: reads a document and returns its chunks.
+    """
+    return list(chunk_paragraphs(iter_paragraphs(docx_path), chunk_tokens, model=model))
+
+
+def _deck_names(sources):
+    """
+    Maps each input name to a unique .pptx name, suffixing repeated stems
+    with the first free -2, -3, ... so no suffixed name hits a real input.
+    """
+    names = []
+    taken = set()
+    for source in sources:
+        stem = os.path.splitext(source)[0]
+        name = f"{stem}.pptx"
+        n = 1
+        while name in taken:
+            n += 1
+            name = f"{stem}-{n}.pptx"
+        taken.add(name)
+        names.append(name)
+    return names
+
+
+async def run_batch(docx_paths, theme, out_dir, pool, concurrency=BATCH_LLM_CONCURRENCY,
+                    requests_per_minute=LLM_REQUESTS_PER_MINUTE, sources=None, progress=None):
+    """
+    Converts many documents with one theme. Extraction and rendering run in
+    `pool`, which the caller owns, while LLM calls for every document go
+    through one shared RequestScheduler. A failing document is recorded in the
+    manifest and does not stop the others. Returns the manifest, one entry per
+    input.
+
+    `sources` are the names reported in the manifest (default: the file names);
+    `progress` receives the documents finished as chunks_done/chunks_total.
+    """
+    progress = progress or (lambda **fields: None)
+    os.makedirs(out_dir, exist_ok=True)
+    scheduler = RequestScheduler(concurrency, requests_per_minute)
+    loop = asyncio.get_running_loop()
+    sources = sources or [os.path.basename(path) for path in docx_paths]
+    done = 0
+
+    async def convert(docx_path, source, deck_name, index):
+        nonlocal done
+        request_id.set(f"{request_id.get() or 'batch'}/{index}")
+        entry = {"source": source, "pptx": None, "status": "ok", "error": None, "slides": 0}
+        started = time.perf_counter()
+        try:
+            with span("extract"):
+                chunks = await loop.run_in_executor(pool, extract_chunks, docx_path, CHUNK_TOKENS, LLM_MODEL)
+            bullets = await summarize_chunks(chunks, scheduler)
+            slides_data = await outline_slides(bullets, scheduler)
+            pptx_path = os.path.join(out_dir, deck_name)
+            # Only this outer span is exported; the worker's theme/save spans stay in its process
+            with span("render", slides=len(slides_data)):
+                await loop.run_in_executor(pool, render_presentation, slides_data, theme, pptx_path, BACKGROUND_DIR)
+            entry.update(pptx=deck_name, slides=len(slides_data))
+        except Exception as e:
+            entry.update(status="error", error=f"{type(e).__name__}: {e}")
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        done += 1
+        progress(stage="converting", chunks_done=done, chunks_total=len(docx_paths))
+        return entry
+
+    progress(stage="converting", chunks_done=0, chunks_total=len(docx_paths))
+    return await asyncio.gather(*(
+        convert(path, source, name, index)
+        for index, (path, source, name) in enumerate(zip(docx_paths, sources, _deck_names(sources)))
+    ))
+
+
+def write_zip(manifest, out_dir, zip_path):
+    """
+    Packs the generated decks and manifest.json into one archive.
+    """
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for entry in manifest:
+            if entry["pptx"]:
+                archive.write(os.path.join(out_dir, entry["pptx"]), entry["pptx"])
+        archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    return zip_path
+
+
+def _collect_inputs(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.docx"))))
+        else:
+            paths.append(item)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert many Word documents into PowerPoint decks.")
+    parser.add_argument("inputs", nargs="+", help=".docx files or folders containing them")
+    parser.add_argument("--theme", required=True, help="theme JSON, or a path to a JSON file")
+    parser.add_argument("--out", default="decks.zip", help="zip archive to write (default: decks.zip)")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_LLM_CONCURRENCY, help="LLM requests in flight")
+    parser.add_argument("--rpm", type=int, default=LLM_REQUESTS_PER_MINUTE, help="LLM requests per minute, 0 for no limit")
+    args = parser.parse_args(argv)
+
+    if os.path.exists(args.theme):
+        with open(args.theme) as f:
+            theme = json.load(f)
+    else:
+        theme = json.loads(args.theme)
+    docx_paths = _collect_inputs(args.inputs)
+    if not docx_paths:
+        parser.error("no .docx files found")
+
+    with tempfile.TemporaryDirectory() as out_dir, make_pool(args.processes) as pool:
+        manifest = asyncio.run(run_batch(docx_paths, theme, out_dir, pool, args.concurrency, args.rpm))
+        write_zip(manifest, out_dir, args.out)
+
+    failed = [entry for entry in manifest if entry["status"] != "ok"]
+    for entry in failed:
+        print(f"{entry['source']}: {entry['error']}", file=sys.stderr)
+    print(f"{len(manifest) - len(failed)}/{len(manifest)} documents converted -> {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
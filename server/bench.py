@@ -0,0 +1,216 @@
+"""
+Offline throughput benchmark of the deck generation pipeline.
+
+Runs generate_presentation over synthetic documents of increasing size against
+the mock LLM provider and reports per-stage wall time, peak Python memory,
+LLM call count and slides per second:
+
+    python bench.py --sizes 20 100 500 --latency 0.05
+    python bench.py --save baseline.json
+    python bench.py --compare baseline.json --tolerance 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from xml.sax.saxutils import escape
+
+os.environ.setdefault("LLM_PROVIDER", "mock")
+
+from pptx import Presentation
+import pipeline
+import server
+from artifacts import ArtifactStore
+from cache import CompletionCache
+from llm import MockProvider
+
+WORDS = (
+    "revenue growth market customer product strategy team quarter risk plan "
+    "launch pricing channel partner retention support platform roadmap cost margin"
+).split()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_STYLES = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:styles {_W}>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style>'
+    "</w:styles>"
+)
+
+
+def _paragraph(text, style=None):
+    ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+    return f"<w:p>{ppr}<w:r><w:t>{escape(text)}</w:t></w:r></w:p>"
+
+
+def make_document(path, paragraphs, seed=0):
+    """
+    Writes a synthetic .docx with a heading every ten paragraphs and a table every fifty.
+    """
+    body = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            body.append(_paragraph(f"Section {i // 10 + 1}", "Heading1"))
+        sentences = []
+        for j in range(5):
+            words = [WORDS[(seed + i * 7 + j * 3 + k) % len(WORDS)] for k in range(12)]
+            sentences.append(" ".join(words).capitalize() + ".")
+        body.append(_paragraph(" ".join(sentences)))
+        if i % 50 == 49:
+            rows = []
+            for r in range(3):
+                cells = "".join(f"<w:tc>{_paragraph(f'{WORDS[(r + c + i) % len(WORDS)]} {r * c}')}</w:tc>" for c in range(3))
+                rows.append(f"<w:tr>{cells}</w:tr>")
+            body.append(f"<w:tbl>{''.join(rows)}</w:tbl>")
+
+    document = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_W}><w:body>'
+        + "".join(body)
+        + "</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _RELS)
+        archive.writestr("word/_rels/document.xml.rels", _DOCUMENT_RELS)
+        archive.writestr("word/document.xml", document)
+        archive.writestr("word/styles.xml", _STYLES)
+
+
+async def run_once(docx_path, theme):
+    """
+    Runs the pipeline once, timing each stage via the progress callback.
+    """
+    stages = {}
+    current = {"stage": None, "started": None}
+
+    def progress(**fields):
+        stage = fields.get("stage")
+        if stage and stage != current["stage"]:
+            now = time.perf_counter()
+            if current["stage"]:
+                stages[current["stage"]] = stages.get(current["stage"], 0.0) + now - current["started"]
+            current.update(stage=stage, started=now)
+
+    started = time.perf_counter()
+    deck = await server.generate_presentation(docx_path, theme, progress=progress)
+    finished = time.perf_counter()
+    stages[current["stage"]] = stages.get(current["stage"], 0.0) + finished - current["started"]
+    return deck.path, finished - started, stages
+
+
+def bench_size(paragraphs, workdir, latency, theme, trace_memory):
+    docx_path = os.path.join(workdir, f"bench-{paragraphs}.docx")
+    make_document(docx_path, paragraphs)
+
+    # Fresh provider and empty cache, so every run pays for every LLM call
+    pipeline.provider = MockProvider(latency=latency)
+    pipeline.completion_cache = CompletionCache(os.path.join(workdir, f"cache-{paragraphs}.sqlite3"))
+
+    if trace_memory:
+        tracemalloc.start()
+    pptx_path, total, stages = asyncio.run(run_once(docx_path, theme))
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+
+    slides = len(Presentation(pptx_path).slides)
+    return {
+        "paragraphs": paragraphs,
+        "docx_bytes": os.path.getsize(docx_path),
+        "seconds": round(total, 4),
+        "stages": {stage: round(seconds, 4) for stage, seconds in stages.items()},
+        "peak_mb": round(peak / 1024 / 1024, 2),
+        "llm_calls": pipeline.provider.calls,
+        "slides": slides,
+        "slides_per_second": round(slides / total, 2) if total else 0.0,
+    }
+
+
+def print_table(results):
+    stage_names = []
+    for result in results:
+        stage_names += [stage for stage in result["stages"] if stage not in stage_names]
+    header = ["paragraphs", "seconds"] + stage_names + ["peak MB", "LLM calls", "slides", "slides/s"]
+    rows = [
+        [str(r["paragraphs"]), f"{r['seconds']:.3f}"]
+        + [f"{r['stages'].get(stage, 0.0):.3f}" for stage in stage_names]
+        + [f"{r['peak_mb']:.1f}", str(r["llm_calls"]), str(r["slides"]), f"{r['slides_per_second']:.1f}"]
+        for r in results
+    ]
+    widths = [max(len(row[i]) for row in rows + [header]) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(cell.rjust(width) for cell, width in zip(row, widths)))
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns the sizes whose slides/s fell more than `tolerance` below the baseline.
+    """
+    before = {r["paragraphs"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        old = before.get(result["paragraphs"])
+        if old and result["slides_per_second"] < old["slides_per_second"] * (1 - tolerance):
+            regressions.append((result["paragraphs"], old["slides_per_second"], result["slides_per_second"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark generate_presentation offline with the mock LLM provider.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500], help="paragraphs per synthetic document")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock LLM latency per call in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows the run down)")
+    parser.add_argument("--save", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from --save to check slides/s against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slides/s drop versus the baseline")
+    args = parser.parse_args(argv)
+
+    theme = {"text": "#000000", "background": "#FFFFFF", "backgroundImage": "15.webp"}
+    with tempfile.TemporaryDirectory() as workdir:
+        server.artifacts = ArtifactStore(os.path.join(workdir, "artifacts"))
+        results = [bench_size(size, workdir, args.latency, theme, not args.no_memory) for size in args.sizes]
+
+    print_table(results)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for paragraphs, old, new in regressions:
+            print(f"REGRESSION: {paragraphs} paragraphs {old:.1f} -> {new:.1f} slides/s", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
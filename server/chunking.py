@@ -0,0 +1,179 @@
+import re
+import zlib
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Characters from scripts that are written without spaces; each is roughly one token
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff\uff00-\uffef]")
+# Zero-width, so the whitespace between sentences stays with the next one
+_SENTENCE_END = re.compile(r"(?<=[。！？；])|(?<=[.!?;])(?=\s)")
+
+_encodings = {}
+
+
+def _encoding(model):
+    """
+    Returns the tiktoken encoding for the model, or None when tiktoken or its
+    BPE files are unavailable (e.g. no network on first use).
+    """
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        try:
+            _encodings[model] = tiktoken.encoding_for_model(model)
+        except Exception:
+            _encodings[model] = None
+    return _encodings[model]
+
+
+def count_tokens(text, model="gpt-3.5-turbo"):
+    """
+    Counts tokens with the model's tokenizer, falling back to an estimate of
+    one token per CJK character plus one per four other characters.
+    """
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def split_text(text, max_tokens, model="gpt-3.5-turbo"):
+    """
+    Splits text exceeding `max_tokens` at sentence ends, hard-splitting any
+    sentence that alone is still too long.
+    """
+    pieces = []
+    current = ""
+    current_tokens = 0
+    for sentence in _SENTENCE_END.split(text):
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence, model)
+        if tokens > max_tokens:
+            if current:
+                pieces.append(current)
+                current, current_tokens = "", 0
+            pieces.extend(_hard_split(sentence, max_tokens, model))
+        elif current_tokens + tokens > max_tokens:
+            pieces.append(current)
+            current, current_tokens = sentence, tokens
+        else:
+            current += sentence
+            current_tokens += tokens
+    if current:
+        pieces.append(current)
+    return [piece.strip() for piece in pieces if piece.strip()]
+
+
+def _hard_split(text, max_tokens, model):
+    encoding = _encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        pieces = []
+        start = 0
+        while start < len(tokens):
+            end = _char_boundary(encoding, tokens, start, min(start + max_tokens, len(tokens)))
+            pieces.append(encoding.decode(tokens[start:end]))
+            start = end
+        return pieces
+
+    pieces = []
+    start = 0
+    cost = 0.0
+    for i, char in enumerate(text):
+        step = 1.0 if _CJK.match(char) else 0.25
+        if cost + step > max_tokens - 1:
+            pieces.append(text[start:i])
+            start, cost = i, 0.0
+        cost += step
+    pieces.append(text[start:])
+    return pieces
+
+
+def _char_boundary(encoding, tokens, start, end):
+    """
+    Moves the cut `end` back until tokens[start:end] decodes to whole
+    characters; byte-level tokens can end in the middle of a CJK character.
+    """
+    for cut in range(end, start, -1):
+        try:
+            encoding.decode_bytes(tokens[start:cut]).decode("utf-8")
+            return cut
+        except UnicodeDecodeError:
+            pass
+    # A single character wider than the budget: cut after it instead
+    for cut in range(end + 1, len(tokens) + 1):
+        try:
+            encoding.decode_bytes(tokens[start:cut]).decode("utf-8")
+            return cut
+        except UnicodeDecodeError:
+            pass
+    return len(tokens)
+
+
+def chunk_paragraphs(paragraphs, max_tokens=1500, min_fill=0.5, model="gpt-3.5-turbo", anchor_every=8):
+    """
+    Packs consecutive paragraphs into chunks of at most `max_tokens` tokens.
+
+    A heading starts a new chunk once the current one is at least `min_fill`
+    of the budget, so sections stay together without producing tiny requests.
+    So does an anchor paragraph, about one in `anchor_every`, picked by a hash
+    of its text: boundaries then follow the content rather than the offset
+    from the start, and after an edit the chunks past the next anchor come out
+    identical, keeping their cached summaries.
+    Paragraphs larger than the budget are split and emitted on their own.
+    Accepts plain strings or extract.Paragraph tuples.
+    """
+    current = []
+    current_tokens = 0
+    for para in paragraphs:
+        text, heading = (para, False) if isinstance(para, str) else para
+        tokens = count_tokens(text, model)
+
+        if tokens > max_tokens:
+            if current:
+                yield "\n\n".join(current)
+                current, current_tokens = [], 0
+            yield from split_text(text, max_tokens, model)
+            continue
+
+        boundary = heading or _is_anchor(text, anchor_every)
+        if current and (
+            current_tokens + tokens > max_tokens
+            or (boundary and current_tokens >= min_fill * max_tokens)
+        ):
+            yield "\n\n".join(current)
+            current, current_tokens = [], 0
+
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        yield "\n\n".join(current)
+
+
+def _is_anchor(text, every):
+    # crc32 rather than hash(), which is salted per process
+    return zlib.crc32(text.encode("utf-8")) % every == 0
+
+
+def group_by_tokens(items, max_tokens, model="gpt-3.5-turbo"):
+    """
+    Groups consecutive items so the lines of each group fit in `max_tokens`.
+    """
+    groups = []
+    current = []
+    current_tokens = 0
+    for item in items:
+        tokens = count_tokens(item, model) + 1
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
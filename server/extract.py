@@ -0,0 +1,109 @@
+import zipfile
+from collections import namedtuple
+from lxml import etree
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+}
+
+# Word saves text boxes twice, as DrawingML in mc:Choice and as VML in
+# mc:Fallback; only the first copy is read
+_TEXT_NODES = etree.XPath(
+    ".//*[self::w:t or self::w:tab or self::w:br or self::w:cr][not(ancestor::mc:Fallback)]", namespaces=_NS
+)
+# Outermost paragraphs only: text-box paragraphs are part of the one anchoring them
+_BLOCK_PARAGRAPHS = etree.XPath(".//w:p[not(ancestor::w:p) and not(ancestor::mc:Fallback)]", namespaces=_NS)
+
+# One text block of the document; `heading` is True for title/heading paragraphs
+Paragraph = namedtuple("Paragraph", ["text", "heading"])
+
+
+def iter_paragraphs(docx_path):
+    """
+    Yields the non-empty text blocks of a Word document in reading order as Paragraphs.
+
+    word/document.xml is parsed incrementally straight from the zip archive, so
+    embedded media is never loaded and each body element is freed once its text
+    has been yielded. Table rows are yielded as one block with cells joined by " | ".
+    """
+    with zipfile.ZipFile(docx_path) as archive:
+        heading_styles = _heading_style_ids(archive)
+        with archive.open("word/document.xml") as xml:
+            for _, elem in etree.iterparse(xml, events=("end",)):
+                parent = elem.getparent()
+                if parent is None or parent.tag != W + "body":
+                    continue
+
+                if elem.tag == W + "tbl":
+                    blocks = [(row, False) for row in _table_rows(elem)]
+                elif elem.tag == W + "p":
+                    blocks = [(_paragraph_text(elem), _is_heading(elem, heading_styles))]
+                else:
+                    blocks = [(_paragraph_text(p), _is_heading(p, heading_styles)) for p in _BLOCK_PARAGRAPHS(elem)]
+
+                for text, heading in blocks:
+                    text = text.strip()
+                    if text:
+                        yield Paragraph(text, heading)
+
+                # Drop everything already consumed from the partially built tree
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def _heading_style_ids(archive):
+    """
+    Returns the ids of paragraph styles named "Title" or "heading N".
+    Ids are localized in non-English Word, so they are resolved via styles.xml.
+    """
+    ids = set()
+    try:
+        styles = etree.fromstring(archive.read("word/styles.xml"))
+    except KeyError:
+        return ids
+    for style in styles.iter(W + "style"):
+        if style.get(W + "type") != "paragraph":
+            continue
+        name = style.find(W + "name")
+        name = (name.get(W + "val") if name is not None else "").lower()
+        if name == "title" or name.startswith("heading"):
+            ids.add(style.get(W + "styleId"))
+    return ids
+
+
+def _is_heading(p, heading_styles):
+    ppr = p.find(W + "pPr")
+    if ppr is None:
+        return False
+    level = ppr.find(W + "outlineLvl")
+    if level is not None and level.get(W + "val") != "9":
+        return True
+    style = ppr.find(W + "pStyle")
+    return style is not None and style.get(W + "val") in heading_styles
+
+
+def _paragraph_text(p):
+    parts = []
+    for node in _TEXT_NODES(p):
+        if node.tag == W + "t":
+            parts.append(node.text or "")
+        elif node.tag == W + "tab":
+            parts.append("\t")
+        else:
+            parts.append("\n")
+    return "".join(parts)
+
+
+def _table_rows(tbl):
+    rows = []
+    for tr in tbl.iter(W + "tr"):
+        cells = []
+        for tc in tr.iterchildren(W + "tc"):
+            text = " ".join(_paragraph_text(p).strip() for p in tc.iterchildren(W + "p"))
+            cells.append(text.strip())
+        if any(cells):
+            rows.append(" | ".join(cells))
+    return rows
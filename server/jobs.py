@@ -0,0 +1,156 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is submitted while the queue is at its depth limit.
+    """
+
+
+class Job:
+    """
+    State of one deck generation request, observable while it runs.
+    """
+
+    def __init__(self, args, runner=None):
+        self.id = uuid.uuid4().hex
+        self.args = args
+        self.runner = runner
+        self.status = "queued"
+        self.stage = "queued"
+        self.chunks_done = 0
+        self.chunks_total = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._version = 0
+        self._changed = asyncio.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    @property
+    def percent(self):
+        if not self.chunks_total:
+            return 100 if self.status == "done" else 0
+        return round(100 * self.chunks_done / self.chunks_total)
+
+    def update(self, **fields):
+        """
+        Sets the given fields and wakes up every watcher of this job.
+        Must be called from the event loop thread.
+        """
+        for key, value in fields.items():
+            setattr(self, key, value)
+        self._version += 1
+        asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def watch(self, heartbeat=None):
+        """
+        Yields a snapshot of the job on every change until it finishes.
+        With `heartbeat` set, yields None after that many seconds without one.
+        """
+        seen = -1
+        while True:
+            if self._version != seen:
+                seen = self._version
+                yield self.to_dict()
+                if self.finished:
+                    return
+            async with self._changed:
+                if self._version == seen:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), heartbeat)
+                    except asyncio.TimeoutError:
+                        pass
+            if self._version == seen:
+                yield None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "chunks_done": self.chunks_done,
+            "chunks_total": self.chunks_total,
+            "percent": self.percent,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """
+    Bounded in-process worker pool fed by a fixed-depth queue.
+
+    `runner(job, *args)` is awaited for every job, unless the job was submitted
+    with its own runner; its return value becomes the job result and any
+    exception marks the job as failed.
+    """
+
+    def __init__(self, runner, workers=2, max_queue=20, keep_finished=500):
+        self.runner = runner
+        self.workers = workers
+        self.max_queue = max_queue
+        self.keep_finished = keep_finished
+        self._jobs = OrderedDict()
+        self._queue = None
+        self._tasks = []
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def full(self):
+        return self._queue.full()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def submit(self, *args, runner=None):
+        """
+        Enqueues a new job and returns it, or raises QueueFullError.
+        """
+        job = Job(args, runner)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} pending)")
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.update(status="running")
+            try:
+                result = await (job.runner or self.runner)(job, *job.args)
+                job.update(status="done", stage="done", result=result, finished_at=time.time())
+            except Exception as e:
+                job.update(status="failed", error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
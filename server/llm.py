@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from openai import AsyncOpenAI, RateLimitError
+from chunking import count_tokens
+
+# Text of one chat completion with the token usage reported for it
+Completion = namedtuple("Completion", ["content", "prompt_tokens", "completion_tokens"])
+
+
+class RateLimitedError(Exception):
+    """
+    Raised by a provider when the backend asks us to slow down; callers retry.
+    """
+
+
+class LLMProvider(ABC):
+    """
+    Interface of the LLM backends: a single-turn chat completion.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def complete(self, prompt, model, temperature, max_tokens):
+        """
+        Returns a Completion, or raises RateLimitedError when throttled.
+        """
+
+
+class OpenAIProvider(LLMProvider):
+    """
+    OpenAI chat completions API. The client is created on first use so the
+    server can start, and be benchmarked, without credentials.
+    """
+
+    name = "openai"
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self._client = None
+
+    async def complete(self, prompt, model, temperature, max_tokens):
+        if self._client is None:
+            # No SDK retries: chat_completion's backoff is the only retry policy, so
+            # each attempt holds one concurrency slot and shows up in the metrics
+            self._client = AsyncOpenAI(api_key=self.api_key or os.environ.get("OPENAI_API_KEY"), max_retries=0)
+        try:
+            response = await self._client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+        except RateLimitError as e:
+            raise RateLimitedError(str(e)) from e
+        usage = response.usage
+        return Completion(
+            response.choices[0].message.content,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0,
+        )
+
+
+class MockProvider(LLMProvider):
+    """
+    Deterministic local stand-in for benchmarks and offline runs.
+
+    Answers are derived from the prompt text alone: summary prompts get bullet
+    points built from its sentences, outline prompts (those asking for the
+    "Slide 1:" format) get one slide per four points. `latency` (+ up to
+    `jitter`) seconds are slept per call, and `failure_rate` /
+    `rate_limit_rate` inject errors using a seeded RNG.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, rate_limit_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+
+    async def complete(self, prompt, model, temperature, max_tokens):
+        self.calls += 1
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.failures += 1
+            raise RateLimitedError("mock rate limit")
+        if roll < self.rate_limit_rate + self.failure_rate:
+            self.failures += 1
+            raise RuntimeError("mock failure")
+
+        if "Slide 1:" in prompt:
+            content = self._slides(prompt)
+        else:
+            content = self._bullets(prompt)
+        return Completion(content, count_tokens(prompt, model), count_tokens(content, model))
+
+    @staticmethod
+    def _bullets(prompt):
+        sentences = [s.strip(" -\"") for s in re.split(r"[\n.!?。！？]+", prompt)]
+        sentences = [s for s in sentences if len(s) > 10]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        picked = sentences[1:5] or [f"point {digest[:8]}"]
+        return "\n".join(f"- {s[:80]}" for s in picked)
+
+    @staticmethod
+    def _slides(prompt):
+        points_text = prompt.split("Points:", 1)[-1].split("Format:", 1)[0]
+        points = [line.strip()[2:] for line in points_text.splitlines() if line.strip().startswith("- ")]
+        lines = []
+        for n, start in enumerate(range(0, max(len(points), 1), 4), 1):
+            group = points[start:start + 4] or ["(empty)"]
+            lines += [f"Slide {n}:", f"Title: {group[0][:40]}", "Bullets:"]
+            lines += [f"- {point}" for point in group]
+            lines.append("")
+        return "\n".join(lines)
+
+
+def get_provider(name):
+    """
+    Returns the provider selected by name ("openai" or "mock").
+    """
+    if name == "openai":
+        return OpenAIProvider()
+    if name == "mock":
+        return MockProvider(
+            latency=float(os.environ.get("MOCK_LLM_LATENCY", "0.05")),
+            jitter=float(os.environ.get("MOCK_LLM_JITTER", "0.0")),
+            failure_rate=float(os.environ.get("MOCK_LLM_FAILURE_RATE", "0.0")),
+            rate_limit_rate=float(os.environ.get("MOCK_LLM_RATE_LIMIT_RATE", "0.0")),
+        )
+    raise ValueError(f"Unknown LLM provider: {name}")
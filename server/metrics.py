@@ -0,0 +1,171 @@
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Id of the job (or batch document) the current task works for; copied into
+# asyncio tasks and to_thread calls, so spans anywhere below a job carry it
+request_id = contextvars.ContextVar("request_id", default=None)
+
+span_logger = logging.getLogger("slidecraft.spans")
+if os.environ.get("SPAN_LOG"):
+    span_logger.setLevel(logging.INFO)
+    span_logger.addHandler(logging.StreamHandler())
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name + _format_labels(self.labels, key), value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """
+    Value that is set rather than accumulated.
+    """
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus exposition format.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append((self.name + "_bucket" + _format_labels(self.labels, key, f'le="{le}"'), cumulative))
+                lines.append((self.name + "_sum" + _format_labels(self.labels, key), total))
+                lines.append((self.name + "_count" + _format_labels(self.labels, key), count))
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(f"{name} {value}" for name, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "slidecraft_stage_seconds", "Wall time of pipeline stages and LLM calls.", ["stage", "outcome"]
+)
+LLM_REQUESTS = registry.counter("slidecraft_llm_requests_total", "LLM requests by outcome.", ["model", "outcome"])
+LLM_RETRIES = registry.counter("slidecraft_llm_retries_total", "LLM requests retried after a rate limit.", ["model"])
+LLM_TOKENS = registry.counter("slidecraft_llm_tokens_total", "LLM tokens sent and received.", ["model", "direction"])
+LLM_CACHE = registry.counter("slidecraft_llm_cache_total", "Completion cache lookups.", ["result"])
+JOB_QUEUE_DEPTH = registry.gauge("slidecraft_job_queue_depth", "Jobs waiting for a worker.")
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Times the enclosed block into slidecraft_stage_seconds and, when span logging
+    is enabled, logs it as one JSON line with the current request id. The yielded
+    dict can be filled with more attributes for the log line.
+    """
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield attrs
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=name, outcome=outcome)
+        if span_logger.isEnabledFor(logging.INFO):
+            span_logger.info(json.dumps({
+                "span": name,
+                "request_id": request_id.get(),
+                "seconds": round(elapsed, 6),
+                "outcome": outcome,
+                **attrs,
+            }, default=str))
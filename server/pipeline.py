@@ -0,0 +1,237 @@
+import asyncio
+import os
+import random
+from cache import CompletionCache
+from chunking import chunk_paragraphs, count_tokens, group_by_tokens
+from llm import RateLimitedError, get_provider
+from metrics import LLM_CACHE, LLM_REQUESTS, LLM_RETRIES, LLM_TOKENS, span
+
+# LLM backend: "openai", or "mock" for offline runs and benchmarks
+provider = get_provider(os.environ.get("LLM_PROVIDER", "openai"))
+
+LLM_MODEL = "gpt-3.5-turbo"
+# Context window of LLM_MODEL, and the token budget for each summarized chunk
+MODEL_CONTEXT_TOKENS = int(os.environ.get("MODEL_CONTEXT_TOKENS", "16385"))
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "1500"))
+SUMMARY_MAX_TOKENS = 500
+SLIDES_MAX_TOKENS = 1500
+# Give up reducing and truncate the points after this many rounds
+MAX_REDUCE_ROUNDS = 4
+
+# Maximum number of chunk summaries in flight at once
+SUMMARY_CONCURRENCY = int(os.environ.get("SUMMARY_CONCURRENCY", "5"))
+# Retries per request when OpenAI answers with a rate-limit error
+SUMMARY_MAX_RETRIES = int(os.environ.get("SUMMARY_MAX_RETRIES", "5"))
+SUMMARY_BACKOFF_BASE = float(os.environ.get("SUMMARY_BACKOFF_BASE", "1.0"))
+
+# On-disk cache of LLM completions, shared by every upload
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "cache", "completions.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+completion_cache = CompletionCache(LLM_CACHE_PATH, max_bytes=LLM_CACHE_MAX_BYTES)
+
+SUMMARY_PROMPT = (
+    "Please summarize the following section into 3 ~ 5 concise bullet points:\n"
+    "\"\"\"{text}\"\"\""
+)
+
+REDUCE_PROMPT = (
+    "Condense the following bullet points into fewer, more general bullet points, "
+    "keeping every key fact. Answer with one \"- \" bullet per line:\n"
+    "{text}"
+)
+
+SLIDES_PROMPT = (
+    "Based on the following summarized points, generate a PowerPoint slide structure:\n"
+    "Each slide should have a title and 3–5 bullet points.\n\n"
+    "Points:\n"
+    "{text}\n\n"
+    "Format:\n"
+    "Slide 1:\n"
+    "Title: ...\n"
+    "Bullets:\n"
+    "- ...\n"
+    "- ...\n\n"
+    "Slide 2:\n"
+    "Title: ...\n"
+    "Bullets:\n"
+    "- ...\n"
+)
+
+# Theme background images offered by the frontend
+BACKGROUND_DIR = os.path.join(os.path.dirname(__file__), "backgroundImages")
+
+
+def _ignore_progress(**fields):
+    pass
+
+
+async def chat_completion(prompt, model, temperature, max_tokens):
+    """
+    Calls the LLM provider, retrying with exponential backoff and jitter
+    when the request is rate limited.
+    """
+    with span("llm", model=model) as attrs:
+        for attempt in range(SUMMARY_MAX_RETRIES + 1):
+            attrs["retries"] = attempt
+            try:
+                completion = await provider.complete(prompt, model, temperature, max_tokens)
+            except RateLimitedError:
+                LLM_REQUESTS.inc(model=model, outcome="rate_limited")
+                if attempt == SUMMARY_MAX_RETRIES:
+                    raise
+                LLM_RETRIES.inc(model=model)
+                delay = SUMMARY_BACKOFF_BASE * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+            except Exception:
+                LLM_REQUESTS.inc(model=model, outcome="error")
+                raise
+            else:
+                LLM_REQUESTS.inc(model=model, outcome="ok")
+                LLM_TOKENS.inc(completion.prompt_tokens, model=model, direction="in")
+                LLM_TOKENS.inc(completion.completion_tokens, model=model, direction="out")
+                attrs.update(tokens_in=completion.prompt_tokens, tokens_out=completion.completion_tokens)
+                return completion
+
+
+async def cached_completion(template, text, model, temperature, max_tokens):
+    """
+    Fills `text` into the prompt template and returns the completion content,
+    answering from the completion cache when the same request was seen before.
+    """
+    key = CompletionCache.make_key(template, text, model, provider.name, temperature=temperature, max_tokens=max_tokens)
+    content = await asyncio.to_thread(completion_cache.get, key)
+    LLM_CACHE.inc(result="miss" if content is None else "hit")
+    if content is not None:
+        return content
+
+    completion = await chat_completion(template.format(text=text), model, temperature, max_tokens)
+    content = completion.content
+    await asyncio.to_thread(completion_cache.put, key, content)
+    return content
+
+
+async def summarize_chunk(chunk, semaphore):
+    """
+    Summarizes a single chunk into bullet points, bounded by the shared semaphore.
+    """
+    async with semaphore:
+        content = await cached_completion(SUMMARY_PROMPT, chunk, LLM_MODEL, temperature=0.5, max_tokens=SUMMARY_MAX_TOKENS)
+    return [line.strip()[2:] for line in content.splitlines() if line.strip().startswith("- ")]
+
+
+async def chunk_and_summarize(paragraphs, chunk_tokens=CHUNK_TOKENS, concurrency=SUMMARY_CONCURRENCY, progress=None):
+    """
+    Splits the document paragraphs into chunks and summarizes them concurrently using OpenAI.
+    At most `concurrency` requests are in flight; bullets keep document order.
+    `paragraphs` may be a lazy generator; it is consumed off the event loop.
+    """
+    with span("extract") as attrs:
+        chunks = await asyncio.to_thread(lambda: list(chunk_paragraphs(paragraphs, chunk_tokens, model=LLM_MODEL)))
+        attrs["chunks"] = len(chunks)
+    return await summarize_chunks(chunks, asyncio.Semaphore(concurrency), progress=progress)
+
+
+async def summarize_chunks(chunks, semaphore, progress=None):
+    """
+    Summarizes already chunked text with requests gated by `semaphore`, which
+    may be shared across documents. Bullets keep document order.
+    """
+    progress = progress or _ignore_progress
+    progress(stage="summarizing", chunks_done=0, chunks_total=len(chunks))
+    done = 0
+
+    async def summarize_and_report(chunk):
+        nonlocal done
+        bullets = await summarize_chunk(chunk, semaphore)
+        done += 1
+        progress(chunks_done=done)
+        return bullets
+
+    with span("summarize", chunks=len(chunks)):
+        results = await asyncio.gather(*(summarize_and_report(chunk) for chunk in chunks))
+
+    summarized_bullets = []
+    for bullets in results:
+        summarized_bullets.extend(bullets)
+
+    return summarized_bullets
+
+
+def _points_budget(template, max_tokens):
+    return MODEL_CONTEXT_TOKENS - max_tokens - count_tokens(template, LLM_MODEL)
+
+
+async def reduce_bullets(bullets, semaphore, progress=None):
+    """
+    Map-reduce step: condenses groups of bullets round by round until they fit
+    the outline prompt's share of the model context.
+    """
+    budget = _points_budget(SLIDES_PROMPT, SLIDES_MAX_TOKENS)
+    group_budget = min(CHUNK_TOKENS, _points_budget(REDUCE_PROMPT, SUMMARY_MAX_TOKENS))
+    progress = progress or _ignore_progress
+
+    async def reduce_group(group):
+        async with semaphore:
+            content = await cached_completion(
+                REDUCE_PROMPT, "- " + "\n- ".join(group), LLM_MODEL, temperature=0.5, max_tokens=SUMMARY_MAX_TOKENS
+            )
+        return [line.strip()[2:] for line in content.splitlines() if line.strip().startswith("- ")]
+
+    for _ in range(MAX_REDUCE_ROUNDS):
+        total = sum(count_tokens(bullet, LLM_MODEL) + 1 for bullet in bullets)
+        if total <= budget:
+            return bullets
+        progress(stage="reducing")
+        groups = group_by_tokens(bullets, group_budget, model=LLM_MODEL)
+        results = await asyncio.gather(*(reduce_group(group) for group in groups))
+        bullets = [bullet for reduced in results for bullet in reduced]
+
+    # Still too long: keep as many leading points as fit
+    return group_by_tokens(bullets, budget, model=LLM_MODEL)[0] if bullets else bullets
+
+
+async def generate_multiple_slides(paragraphs, progress=None):
+    """
+    Generates slide structure based on summarized bullet points.
+    """
+    summarized_bullets = await chunk_and_summarize(paragraphs, progress=progress)
+    return await outline_slides(summarized_bullets, asyncio.Semaphore(SUMMARY_CONCURRENCY), progress=progress)
+
+
+async def outline_slides(summarized_bullets, semaphore, progress=None):
+    """
+    Reduces the bullets to fit the context and asks for the slide structure.
+    """
+    progress = progress or _ignore_progress
+    with span("reduce", bullets=len(summarized_bullets)):
+        summarized_bullets = await reduce_bullets(summarized_bullets, semaphore, progress=progress)
+    progress(stage="outlining")
+
+    points = "- " + "\n- ".join(summarized_bullets)
+    with span("outline", bullets=len(summarized_bullets)):
+        async with semaphore:
+            output = await cached_completion(SLIDES_PROMPT, points, LLM_MODEL, temperature=0.7, max_tokens=SLIDES_MAX_TOKENS)
+    with span("parse") as attrs:
+        slides_data = parse_multiple_slides(output)
+        attrs["slides"] = len(slides_data)
+    return slides_data
+
+
+def parse_multiple_slides(output_text):
+    """
+    Parses GPT output into structured slide dictionaries.
+    """
+    slides = []
+    current_slide = {}
+    for line in output_text.splitlines():
+        if line.lower().startswith("slide"):
+            if current_slide:
+                slides.append(current_slide)
+            current_slide = {"title": "", "bullets": []}
+        elif line.lower().startswith("title:"):
+            current_slide["title"] = line.split(":", 1)[1].strip()
+        elif line.strip().startswith("- "):
+            current_slide["bullets"].append(line.strip()[2:])
+    if current_slide:
+        slides.append(current_slide)
+    return slides
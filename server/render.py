@@ -0,0 +1,119 @@
+import io
+import os
+from functools import lru_cache
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.util import Inches, Pt
+from metrics import span
+
+# "Title Only" layout of the default template
+TITLE_ONLY_LAYOUT = 5
+
+
+def parse_color(value):
+    """
+    Converts a "#RRGGBB" string into an RGBColor.
+    """
+    return RGBColor(int(value[1:3], 16), int(value[3:5], 16), int(value[5:7], 16))
+
+
+def render_presentation(slides_data, theme, pptx_path, background_dir):
+    """
+    Builds the deck from the cached, pre-themed template for `theme` and saves it.
+    Text colour is applied while each slide is created.
+
+    The "theme" and "save" spans only reach /metrics when this runs in the
+    server process. Batch renders run in worker processes with their own
+    registry and are reported through the caller's "render" span alone.
+    """
+    with span("theme"):
+        prs = Presentation(io.BytesIO(themed_template(theme, background_dir)))
+    text_color = parse_color(theme["text"])
+    layout = prs.slide_layouts[TITLE_ONLY_LAYOUT]
+
+    for slide_data in slides_data:
+        slide = prs.slides.add_slide(layout)
+        title_frame = slide.shapes.title.text_frame
+        run = title_frame.paragraphs[0].add_run()
+        run.text = slide_data["title"]
+        run.font.size = Inches(0.56)
+        run.font.color.rgb = text_color
+
+        content_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(4))
+        text_frame = content_box.text_frame
+        text_frame.word_wrap = True
+        for i, point in enumerate(slide_data["bullets"]):
+            p = text_frame.paragraphs[0] if i == 0 else text_frame.add_paragraph()
+            p.level = 0
+            run = p.add_run()
+            run.text = f"• {point}"
+            run.font.size = Pt(28)
+            run.font.color.rgb = text_color
+
+    with span("save"):
+        prs.save(pptx_path)
+    return pptx_path
+
+
+def themed_template(theme, background_dir):
+    """
+    Returns the serialized template for the theme's background, building it on first use.
+    """
+    background_image = theme.get("backgroundImage", None)
+    if background_image:
+        background_path = os.path.join(background_dir, os.path.basename(background_image))
+        if os.path.exists(background_path):
+            return _image_template(background_path, os.path.getmtime(background_path))
+    return _color_template(theme["background"].upper())
+
+
+@lru_cache(maxsize=32)
+def _image_template(background_path, mtime):
+    """
+    Embeds the background image once, as the slide master's background fill,
+    so every slide references the same media part.
+    """
+    prs = Presentation()
+    master = prs.slide_master
+    _, rId = master.part.get_or_add_image_part(background_path)
+    bg = parse_xml(
+        f"<p:bg {nsdecls('p', 'a', 'r')}><p:bgPr>"
+        f'<a:blipFill dpi="0" rotWithShape="1"><a:blip r:embed="{rId}"/><a:srcRect/>'
+        "<a:stretch><a:fillRect/></a:stretch></a:blipFill><a:effectLst/>"
+        "</p:bgPr></p:bg>"
+    )
+    _set_master_background(prs, bg)
+    return _serialize(prs)
+
+
+@lru_cache(maxsize=32)
+def _color_template(background_color):
+    prs = Presentation()
+    prs.slide_master.background.fill.solid()
+    prs.slide_master.background.fill.fore_color.rgb = parse_color(background_color)
+    _clear_layout_backgrounds(prs)
+    return _serialize(prs)
+
+
+def _set_master_background(prs, bg):
+    cSld = prs.slide_master._element.cSld
+    if cSld.bg is not None:
+        cSld.remove(cSld.bg)
+    cSld.insert(0, bg)
+    _clear_layout_backgrounds(prs)
+
+
+def _clear_layout_backgrounds(prs):
+    # Layouts with their own background would hide the master's
+    for layout in prs.slide_layouts:
+        cSld = layout._element.cSld
+        if cSld.bg is not None:
+            cSld.remove(cSld.bg)
+
+
+def _serialize(prs):
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
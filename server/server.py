@@ -1,18 +1,57 @@
-from fastapi import FastAPI, UploadFile, Form
+from fastapi import FastAPI, UploadFile, Form, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from contextlib import asynccontextmanager
 import os
 import json
-from docx import Document
-from pptx import Presentation
-from pptx.dml.color import RGBColor
-from pptx.util import Inches, Pt
-from openai import OpenAI
+import asyncio
+import mimetypes
+import shutil
+from jobs import JobManager, QueueFullError
+from extract import iter_paragraphs
+from render import render_presentation
+from batch import BATCH_PROCESSES, make_pool, run_batch, write_zip
+from pipeline import BACKGROUND_DIR, completion_cache, generate_multiple_slides
+from artifacts import ArtifactStore
+from metrics import JOB_QUEUE_DEPTH, registry, request_id, span
+
+# Deck generation jobs running at once, and how many may wait behind them
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", "20"))
+# Seconds between keep-alive comments on an idle progress stream, so proxies don't cut it
+SSE_HEARTBEAT_SECONDS = int(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+
+
+async def run_job(job, upload, theme):
+    """
+    Job body: generates the deck and reports progress on the job.
+    """
+    request_id.set(job.id)
+    deck_name = os.path.splitext(upload.filename)[0] + ".pptx"
+    with span("job", source=upload.filename):
+        deck = await generate_presentation(upload.path, theme, progress=job.update, filename=deck_name)
+    return {"pptx_url": f"http://localhost:8000/download/{deck.id}"}
+
+
+jobs = JobManager(run_job, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE)
+# Extraction and rendering processes shared by every /batch job, created at startup
+batch_pool = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global batch_pool
+    batch_pool = make_pool(BATCH_PROCESSES)
+    await jobs.start()
+    cleanup = asyncio.create_task(artifacts.run_cleanup(ARTIFACT_CLEANUP_INTERVAL))
+    yield
+    cleanup.cancel()
+    await jobs.stop()
+    batch_pool.shutdown(wait=False, cancel_futures=True)
 
-client = OpenAI(api_key="")
 
 # Initialize FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend
 app.add_middleware(
@@ -23,222 +62,184 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Upload directory
+# Upload directory; the artifact store of uploads and generated decks lives in its own subfolder
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "uploads")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+ARTIFACT_DIR = os.path.join(UPLOAD_DIR, "artifacts")
+ARTIFACT_TTL_SECONDS = int(os.environ.get("ARTIFACT_TTL_SECONDS", str(24 * 3600)))
+ARTIFACT_MAX_BYTES = int(os.environ.get("ARTIFACT_MAX_BYTES", str(2 * 1024 ** 3)))
+ARTIFACT_CLEANUP_INTERVAL = int(os.environ.get("ARTIFACT_CLEANUP_INTERVAL", "300"))
+artifacts = ArtifactStore(ARTIFACT_DIR, ttl_seconds=ARTIFACT_TTL_SECONDS, max_bytes=ARTIFACT_MAX_BYTES)
+
+# Uploads are copied to disk in blocks of this size and rejected above the cap
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(512 * 1024 * 1024)))
 
 @app.post("/upload")
 async def upload_file(file: UploadFile, parse_images: bool = Form(False), theme: str = Form("")):
     """
-    Accepts a Word document and converts it into a PowerPoint presentation.
+    Accepts a Word document and queues its conversion into a PowerPoint presentation.
+    Returns the job id immediately; poll /jobs/{job_id} or stream /jobs/{job_id}/events.
     """
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
+    if jobs.full():
+        raise HTTPException(status_code=429, detail="Too many pending jobs, retry later", headers={"Retry-After": "5"})
+
+    with span("upload"):
+        upload = await save_upload(file)
 
     theme_data = json.loads(theme)
-    pptx_file = generate_presentation(file_path, theme_data)
-    return {"pptx_url": f"http://localhost:8000/download/{os.path.basename(pptx_file)}"}
+    try:
+        job = jobs.submit(upload, theme_data)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return {
+        "job_id": job.id,
+        "status_url": f"http://localhost:8000/jobs/{job.id}",
+        "events_url": f"http://localhost:8000/jobs/{job.id}/events",
+    }
+
+
+async def save_upload(file):
+    """
+    Streams the upload into the artifact store block by block, enforcing MAX_UPLOAD_BYTES.
+    """
+    upload = await artifacts.save_stream(
+        lambda: file.read(UPLOAD_BLOCK_SIZE), os.path.basename(file.filename), max_bytes=MAX_UPLOAD_BYTES
+    )
+    if upload is None:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES} bytes")
+    return upload
 
 
-def generate_presentation(docx_path, theme):
+@app.post("/batch")
+async def upload_batch(files: list[UploadFile], theme: str = Form("")):
     """
-    Reads the Word document, summarizes content, and creates slides.
+    Accepts many Word documents and queues one job converting them all with the same theme.
+    The job result links to a zip of the decks plus a manifest of per-file outcomes.
     """
-    doc = Document(docx_path)
-    full_text = "\n\n".join([para.text.strip() for para in doc.paragraphs if para.text.strip()])
-    slides_data = generate_multiple_slides(full_text)
-
-    prs = Presentation()
-    for slide_data in slides_data:
-        slide = prs.slides.add_slide(prs.slide_layouts[5])
-        title_shape = slide.shapes.title
-        title_shape.text = slide_data["title"]
-
-        for i, layout in enumerate(prs.slide_layouts):
-            print(f"Layout {i}: {layout.name}")
-
-        for paragraph in title_shape.text_frame.paragraphs:
-            for run in paragraph.runs:
-                run.font.size = Inches(0.56)  
-
-        content_placeholder = None
-        for shape in slide.placeholders:
-            if shape.placeholder_format.type == 2:  
-                content_placeholder = shape
-                break
-
-        if content_placeholder:
-            text_frame = content_placeholder.text_frame
-            text_frame.clear()
-            for point in slide_data["bullets"]:
-                p = text_frame.add_paragraph()
-                p.level = 0
-                run.text = f"• {point}"
-                run = p.add_run(point)
-                run.font.size = Pt(28)
-        else:
-            print("進來這裡了")
-            left = Inches(1)
-            top = Inches(2)
-            width = Inches(8)
-            height = Inches(4)
-            content_box = slide.shapes.add_textbox(left, top, width, height)
-            text_frame = content_box.text_frame
-            text_frame.clear()
-            text_frame.word_wrap = True
-            for point in slide_data["bullets"]:
-                p = text_frame.add_paragraph()
-                p.level = 0
-                run = p.add_run()        
-                run.text = f"• {point}"
-                run.font.size = Pt(28)
-
-    apply_theme(prs, theme)
-
-    pptx_filename = os.path.splitext(os.path.basename(docx_path))[0] + ".pptx"
-    pptx_path = os.path.join(UPLOAD_DIR, pptx_filename)
-    prs.save(pptx_path)
-
-    return pptx_path
-
-
-def chunk_and_summarize(full_text, chunk_size=1000):
-    """
-    Splits the full document into chunks and summarizes each using OpenAI.
-    """
-    paragraphs = full_text.split("\n\n")
-    chunks = []
-    current = ""
-
-    for para in paragraphs:
-        if len(current) + len(para) < chunk_size:
-            current += para + "\n\n"
-        else:
-            chunks.append(current.strip())
-            current = para + "\n\n"
-    if current:
-        chunks.append(current.strip())
-
-    summarized_bullets = []
-
-    for chunk in chunks:
-        prompt = (
-            "Please summarize the following section into 3 ~ 5 concise bullet points:\n"
-            f"\"\"\"{chunk}\"\"\""
-        )
-
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.5,
-            max_tokens=500
-        )
-        content = response.choices[0].message.content
-        bullets = [line.strip()[2:] for line in content.splitlines() if line.strip().startswith("- ")]
-        summarized_bullets.extend(bullets)
-
-    return summarized_bullets
-
-
-def generate_multiple_slides(full_text):
-    """
-    Generates slide structure based on summarized bullet points.
-    """
-    summarized_bullets = chunk_and_summarize(full_text)
-
-    prompt = (
-        "Based on the following summarized points, generate a PowerPoint slide structure:\n"
-        "Each slide should have a title and 3–5 bullet points.\n\n"
-        "Points:\n"
-        "- " + "\n- ".join(summarized_bullets) + "\n\n"
-        "Format:\n"
-        "Slide 1:\n"
-        "Title: ...\n"
-        "Bullets:\n"
-        "- ...\n"
-        "- ...\n\n"
-        "Slide 2:\n"
-        "Title: ...\n"
-        "Bullets:\n"
-        "- ...\n"
-    )
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.7,
-        max_tokens=1500
-    )
-    output = response.choices[0].message.content
-    return parse_multiple_slides(output)
+    if jobs.full():
+        raise HTTPException(status_code=429, detail="Too many pending jobs, retry later", headers={"Retry-After": "5"})
 
+    uploads = []
+    for file in files:
+        uploads.append(await save_upload(file))
 
-def parse_multiple_slides(output_text):
+    theme_data = json.loads(theme)
+    try:
+        job = jobs.submit(uploads, theme_data, runner=run_batch_job)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    return {
+        "job_id": job.id,
+        "status_url": f"http://localhost:8000/jobs/{job.id}",
+        "events_url": f"http://localhost:8000/jobs/{job.id}/events",
+    }
+
+
+async def run_batch_job(job, uploads, theme):
     """
-    Parses GPT output into structured slide dictionaries.
+    Job body for /batch: converts every document and zips the results.
     """
-    slides = []
-    current_slide = {}
-    for line in output_text.splitlines():
-        if line.lower().startswith("slide"):
-            if current_slide:
-                slides.append(current_slide)
-            current_slide = {"title": "", "bullets": []}
-        elif line.lower().startswith("title:"):
-            current_slide["title"] = line.split(":", 1)[1].strip()
-        elif line.strip().startswith("- "):
-            current_slide["bullets"].append(line.strip()[2:])
-    if current_slide:
-        slides.append(current_slide)
-    return slides
+    request_id.set(job.id)
+    out_dir = artifacts.temp_path()
+    zip_path = artifacts.temp_path(".zip")
+    try:
+        with span("batch", documents=len(uploads)):
+            manifest = await run_batch(
+                [upload.path for upload in uploads], theme, out_dir, batch_pool,
+                sources=[upload.filename for upload in uploads], progress=job.update,
+            )
+            await asyncio.to_thread(write_zip, manifest, out_dir, zip_path)
+            archive = await asyncio.to_thread(artifacts.commit, zip_path, f"slidecraft-batch-{job.id[:8]}.zip")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+    return {"zip_url": f"http://localhost:8000/download/{archive.id}", "manifest": manifest}
 
 
-def apply_theme(prs, theme):
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
     """
-    Applies background color, text color, and background image if provided.
+    Returns the current stage and progress of a generation job.
     """
-    text_color = RGBColor(
-        int(theme["text"][1:3], 16),
-        int(theme["text"][3:5], 16),
-        int(theme["text"][5:7], 16),
-    )
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+    """
+    Streams job progress as server-sent events until the job finishes.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        async for snapshot in job.watch(heartbeat=SSE_HEARTBEAT_SECONDS):
+            if snapshot is None:
+                yield ": ping\n\n"
+            else:
+                yield f"data: {json.dumps(snapshot)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def generate_presentation(docx_path, theme, progress=None, filename=None):
+    """
+    Reads the Word document, summarizes content, and creates slides.
+    Blocking DOCX/PPTX work runs in a thread so the event loop stays free.
+    `progress(**fields)` is called with the current stage and chunk counts.
+    Returns the deck's Artifact, served under `filename` (default: the document's name).
+    """
+    progress = progress or (lambda **fields: None)
+    progress(stage="extracting")
+    slides_data = await generate_multiple_slides(iter_paragraphs(docx_path), progress=progress)
+    progress(stage="rendering")
+    filename = filename or os.path.splitext(os.path.basename(docx_path))[0] + ".pptx"
+    return await asyncio.to_thread(build_presentation, slides_data, theme, filename)
 
-    background_image = theme.get("backgroundImage", None)
-    background_path = None
-    print("background_image" + str(background_image))
-    if background_image:
-        background_path = os.path.join(os.path.dirname(__file__), "backgroundImages", background_image)
-    print("background_path: " + str(background_path))
-    for slide in prs.slides:
-        if background_path and os.path.exists(background_path):
-            pic = slide.shapes.add_picture(background_path, 0, 0, width=prs.slide_width, height=prs.slide_height)
-            slide.shapes._spTree.remove(pic._element)
-            slide.shapes._spTree.insert(2, pic._element)
-
-        else:
-            # Fallback to solid color background
-            background_color = RGBColor(
-                int(theme["background"][1:3], 16),
-                int(theme["background"][3:5], 16),
-                int(theme["background"][5:7], 16),
-            )
-            slide.background.fill.solid()
-            slide.background.fill.fore_color.rgb = background_color
 
-        # Set text color
-        for shape in slide.shapes:
-            if hasattr(shape, "text_frame") and shape.text_frame:
-                for para in shape.text_frame.paragraphs:
-                    para.font.color.rgb = text_color
+def build_presentation(slides_data, theme, filename):
+    """
+    Renders the slide structure into a themed PPTX and stores it as an artifact.
+    """
+    pptx_path = artifacts.temp_path(".pptx")
+    with span("render", slides=len(slides_data)):
+        render_presentation(slides_data, theme, pptx_path, BACKGROUND_DIR)
+    return artifacts.commit(pptx_path, filename)
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Exposes stage timings, LLM usage and queue depth in the Prometheus text format.
+    """
+    JOB_QUEUE_DEPTH.set(jobs.depth())
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Reports hit/miss counters and size of the LLM completion cache.
+    """
+    return completion_cache.stats()
 
-@app.get("/download/{filename}")
-async def download_pptx(filename: str):
+@app.get("/download/{artifact_id}")
+async def download_artifact(artifact_id: str, request: Request):
     """
-    Serves the generated PPTX file.
+    Serves a generated deck or batch zip by artifact id.
+    The id is the content hash, so it doubles as a strong ETag: If-None-Match
+    answers 304, and Range / If-Range requests are served by FileResponse.
     """
-    pptx_path = os.path.join(UPLOAD_DIR, filename)
-    if os.path.exists(pptx_path):
-        return FileResponse(pptx_path, filename=filename)
-    return {"error": "File not found"}
\ No newline at end of file
+    artifact = artifacts.get(artifact_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="File not found")
+
+    etag = f'"{artifact.id}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={ARTIFACT_TTL_SECONDS}, immutable"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    media_type = mimetypes.guess_type(artifact.filename)[0] or "application/octet-stream"
+    return FileResponse(artifact.path, filename=artifact.filename, media_type=media_type, headers=headers)
\ No newline at end of file
@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import os
+import time
+
+from artifacts import ArtifactStore
+
+
+def _put(store, data, filename):
+    path = store.temp_path()
+    with open(path, "wb") as f:
+        f.write(data)
+    return store.commit(path, filename)
+
+
+def _age(store, artifact, seconds):
+    stamp = time.time() - seconds
+    os.utime(artifact.path, (stamp, stamp))
+    store._last_access.pop(artifact.id, None)
+
+
+def test_commit_dedupes_and_keeps_first_filename(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    first = _put(store, b"same deck", "alice.pptx")
+    second = _put(store, b"same deck", "bob.pptx")
+    assert first.id == second.id
+    assert second.filename == "bob.pptx"
+    assert store.get(first.id).filename == "alice.pptx"
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_evict_removes_expired_artifacts(tmp_path):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=60)
+    old = _put(store, b"old", "old.pptx")
+    new = _put(store, b"new", "new.pptx")
+    _age(store, old, 120)
+    assert store.evict() == 1
+    assert store.get(old.id) is None
+    assert store.get(new.id) is not None
+
+
+def test_evict_removes_least_recently_used_over_size_limit(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_bytes=10, grace_seconds=30)
+    oldest = _put(store, b"a" * 6, "a.pptx")
+    older = _put(store, b"b" * 6, "b.pptx")
+    fresh = _put(store, b"c" * 6, "c.pptx")
+    _age(store, oldest, 120)
+    _age(store, older, 60)
+    # Over the limit until both aged ones are gone; the fresh one is in its grace period
+    assert store.evict() == 2
+    assert store.get(fresh.id) is not None
+
+
+def test_evict_skips_files_that_vanish_during_the_scan(tmp_path, monkeypatch):
+    store = ArtifactStore(str(tmp_path), ttl_seconds=0)
+    _put(store, b"deck", "deck.pptx")
+    with open(store.temp_path(), "wb") as f:
+        f.write(b"staged")
+    real_scandir = os.scandir
+
+    @contextlib.contextmanager
+    def scandir(path):
+        with real_scandir(path) as it:
+            entries = list(it)
+        # As if each file were renamed away right after the listing
+        for entry in entries:
+            if entry.is_file():
+                os.remove(entry.path)
+        yield iter(entries)
+
+    monkeypatch.setattr(os, "scandir", scandir)
+    assert store.evict() == 0
+
+
+def test_run_cleanup_survives_a_failed_pass(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    calls = []
+
+    def evict():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk hiccup")
+        return 0
+
+    store.evict = evict
+
+    async def run():
+        task = asyncio.create_task(store.run_cleanup(0))
+        while len(calls) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert len(calls) >= 2
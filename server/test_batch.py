@@ -0,0 +1,11 @@
+from batch import _deck_names
+
+
+def test_deck_names_suffix_repeated_stems():
+    assert _deck_names(["x.docx", "x.docx", "x.docx"]) == ["x.pptx", "x-2.pptx", "x-3.pptx"]
+
+
+def test_deck_names_never_collide_with_real_inputs():
+    for sources in (["a.docx", "a.docx", "a-2.docx"], ["a-2.docx", "a.docx", "a.docx"]):
+        names = _deck_names(sources)
+        assert len(set(names)) == len(names)
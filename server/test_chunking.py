@@ -0,0 +1,76 @@
+import random
+
+import chunking
+from chunking import chunk_paragraphs, count_tokens, split_text
+
+WORDS = "revenue growth market customer product strategy team quarter risk plan launch pricing".split()
+
+
+def test_split_text_keeps_space_between_sentences():
+    assert split_text("Hello there friend. This is a test.", 100) == ["Hello there friend. This is a test."]
+
+
+def test_split_text_breaks_at_sentence_ends():
+    sentences = [f"Sentence number {i} talks about the quarterly plan." for i in range(20)]
+    pieces = split_text(" ".join(sentences), 40)
+    assert len(pieces) > 1
+    assert all(count_tokens(piece) <= 40 for piece in pieces)
+    assert " ".join(pieces) == " ".join(sentences)
+
+
+def test_split_text_keeps_decimals_together():
+    assert split_text("Revenue grew 3.5 percent. Costs fell.", 100) == ["Revenue grew 3.5 percent. Costs fell."]
+
+
+def test_split_text_splits_cjk_without_spaces():
+    text = "今天天气很好。" * 30
+    pieces = split_text(text, 50)
+    assert len(pieces) > 1
+    assert all(piece.endswith("。") for piece in pieces)
+    assert "".join(pieces) == text
+
+
+def test_chunk_paragraphs_splits_oversized_paragraph_with_spaces():
+    paragraph = " ".join(f"Point {i} is about pricing and retention." for i in range(50))
+    chunks = list(chunk_paragraphs([paragraph], max_tokens=60))
+    assert len(chunks) > 1
+    assert all(". Point" in chunk for chunk in chunks if chunk.count(".") > 1)
+    assert " ".join(chunks) == paragraph
+
+
+def test_chunk_paragraphs_boundaries_survive_an_insertion():
+    rng = random.Random(7)
+
+    def paragraph():
+        return " ".join(" ".join(rng.choice(WORDS) for _ in range(12)).capitalize() + "." for _ in range(rng.randint(2, 6)))
+
+    document = [paragraph() for _ in range(200)]
+    edited = document[:3] + [paragraph()] + document[3:]
+    before = list(chunk_paragraphs(document, max_tokens=1500))
+    after = set(chunk_paragraphs(edited, max_tokens=1500))
+    assert sum(chunk in after for chunk in before) >= 0.8 * len(before)
+
+
+class ByteEncoding:
+    """
+    One token per UTF-8 byte, like the byte fallback of tiktoken's encodings.
+    """
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+
+def test_split_text_cuts_tokens_on_character_boundaries(monkeypatch):
+    monkeypatch.setattr(chunking, "_encoding", lambda model: ByteEncoding())
+    text = "今天天气很好" * 20
+    pieces = split_text(text, 10)
+    assert len(pieces) > 1
+    assert all("�" not in piece for piece in pieces)
+    assert all(len(piece.encode("utf-8")) <= 10 for piece in pieces)
+    assert "".join(pieces) == text
@@ -0,0 +1,34 @@
+import zipfile
+
+from extract import iter_paragraphs
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def _write_docx(path, body):
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {_W} {_MC}><w:body>{body}</w:body></w:document>'
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", document)
+
+
+def _text_box(text):
+    box = f"<w:txbxContent><w:p><w:r><w:t>{text}</w:t></w:r></w:p></w:txbxContent>"
+    return (
+        "<w:r><mc:AlternateContent>"
+        f"<mc:Choice Requires=\"wps\"><w:drawing>{box}</w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict>{box}</w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r>"
+    )
+
+
+def test_text_box_is_read_once(tmp_path):
+    path = tmp_path / "box.docx"
+    _write_docx(path, f"<w:p><w:r><w:t>Intro </w:t></w:r>{_text_box('Boxed')}</w:p>")
+    assert [p.text for p in iter_paragraphs(path)] == ["Intro Boxed"]
+
+
+def test_text_box_in_content_control_is_read_once(tmp_path):
+    path = tmp_path / "sdt.docx"
+    _write_docx(path, f"<w:sdt><w:sdtContent><w:p>{_text_box('Boxed')}</w:p><w:p><w:r><w:t>After</w:t></w:r></w:p></w:sdtContent></w:sdt>")
+    assert [p.text for p in iter_paragraphs(path)] == ["Boxed", "After"]